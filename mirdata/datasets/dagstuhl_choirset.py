@@ -42,12 +42,17 @@
     (4) Joint Research Centre, European Commission, Seville, ES
 """
 import csv
+import functools
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import BinaryIO, Optional, TextIO, Tuple
 
-import librosa
 import numpy as np
+import soundfile as sf
 
-from mirdata import download_utils, jams_utils, core, annotations, io
+from mirdata import download_utils, core, annotations, io
 
 BIBTEX = """
 @article{RosenzweigCWSGM20_DCS_TISMIR,
@@ -78,6 +83,22 @@ LICENSE_INFO = """
 Creative Commons Attribution 4.0 International
 """
 
+# if this environment variable is set, the load_audio, load_f0 and load_score
+# functions of this loader cache parsed annotations and resampled audio as .npy
+# files next to the original files and load them from there on later loads
+_NPY_CACHE_ENV = "MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE"
+_NPY_CACHE_ENABLED_VALUES = {"1", "true", "yes", "on"}
+
+# mkstemp creates files readable only by their owner, so cache files are given
+# the permissions new files usually get instead
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# index keys of per-microphone audio and f0 files, e.g. "audio_dyn", "f0_crepe_dyn"
+_MIC_KEY_PATTERN = re.compile(
+    r"^(?:audio|f0_(?P<method>crepe|pyin|manual))_(?P<mic>dyn|hsm|lrx)$"
+)
+
 
 class Track(core.Track):
     """Dagstuhl ChoirSet Track class
@@ -97,17 +118,25 @@ class Track(core.Track):
         f0_pyin_lrx_path (str): pyin f0 annotation for larynx microphone path
         f0_manual_lrx_path (str): manual f0 annotation for larynx microphone path
         score_path (str): score annotation path
+        audio_paths (dict): audio paths by microphone, e.g. ``"dyn"``
+        f0_paths (dict): f0 annotation paths by (method, microphone),
+            e.g. ``("crepe", "dyn")``
 
     Cached Properties:
         f0_crepe_dyn (F0Data): algorithm-labeled (crepe) f0 annotations for dynamic microphone
-        f0_crepe_hsn (F0Data): algorithm-labeled (crepe) f0 annotations for headset microphone
+        f0_crepe_hsm (F0Data): algorithm-labeled (crepe) f0 annotations for headset microphone
         f0_crepe_lrx (F0Data): algorithm-labeled (crepe) f0 annotations for larynx microphone
         f0_pyin_dyn (F0Data): algorithm-labeled (pyin) f0 annotations for dynamic microphone
-        f0_pyin_hsn (F0Data): algorithm-labeled (pyin) f0 annotations for headset microphone
+        f0_pyin_hsm (F0Data): algorithm-labeled (pyin) f0 annotations for headset microphone
         f0_pyin_lrx (F0Data): algorithm-labeled (pyin) f0 annotations for larynx microphone
         f0_manual_lrx (F0Data): manually labeled f0 annotations for larynx microphone
         score (NoteData): time-aligned score representation
 
+    The f0 properties are loaded through a module-level cache keyed by file path
+    and modification time, so Tracks with the same F0 file share one F0Data
+    object. Do not modify it in place. Up to 1024 trajectories are kept in
+    memory until ``clear_f0_cache()`` is called.
+
     """
 
     def __init__(self, track_id, data_home, dataset_name, index, metadata):
@@ -136,33 +165,44 @@ class Track(core.Track):
 
         self.score_path = self.get_path("score")
 
+        self.audio_paths = {}
+        self.f0_paths = {}
+        for key in self._track_paths:
+            match = _MIC_KEY_PATTERN.match(key)
+            if not match:
+                continue
+            if match["method"]:
+                self.f0_paths[(match["method"], match["mic"])] = self.get_path(key)
+            else:
+                self.audio_paths[match["mic"]] = self.get_path(key)
+
     @core.cached_property
     def f0_crepe_dyn(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_crepe_dyn_path)
+        return _load_f0_cached(self.f0_crepe_dyn_path)
 
     @core.cached_property
     def f0_crepe_hsm(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_crepe_hsm_path)
+        return _load_f0_cached(self.f0_crepe_hsm_path)
 
     @core.cached_property
     def f0_crepe_lrx(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_crepe_lrx_path)
+        return _load_f0_cached(self.f0_crepe_lrx_path)
 
     @core.cached_property
     def f0_pyin_dyn(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_pyin_dyn_path)
+        return _load_f0_cached(self.f0_pyin_dyn_path)
 
     @core.cached_property
     def f0_pyin_hsm(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_pyin_hsm_path)
+        return _load_f0_cached(self.f0_pyin_hsm_path)
 
     @core.cached_property
     def f0_pyin_lrx(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_pyin_lrx_path)
+        return _load_f0_cached(self.f0_pyin_lrx_path)
 
     @core.cached_property
     def f0_manual_lrx(self) -> Optional[annotations.F0Data]:
-        return load_f0(self.f0_manual_lrx_path)
+        return _load_f0_cached(self.f0_manual_lrx_path)
 
     @core.cached_property
     def score(self) -> Optional[annotations.NoteData]:
@@ -203,18 +243,20 @@ class Track(core.Track):
 
     def to_jams(self):
         """Jams: the track's data in jams format"""
-
-        f0_data = [
-            (self.f0_crepe_dyn, "crepe - DYN"),
-            (self.f0_crepe_hsm, "crepe - HSM"),
-            (self.f0_crepe_lrx, "crepe - LRX"),
-            (self.f0_pyin_dyn, "pyin - DYN"),
-            (self.f0_pyin_hsm, "pyin - HSM"),
-            (self.f0_pyin_lrx, "pyin - LRX"),
-            (self.f0_manual_lrx, "manual - LRX"),
-        ]
-        # remove missing annotations from the list
-        f0_data = [tup for tup in f0_data if tup[1]]
+        # jams_utils imports jams and librosa, which are slow to import
+        from mirdata import jams_utils
+
+        # f0 files are independent, so parse them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(self.f0_paths)) or 1) as pool:
+            # jams_converter needs a list, so build it straight from the
+            # lazy map results instead of collecting them first
+            f0_data = [
+                (f0, f"{method} - {mic.upper()}")
+                for f0, (method, mic) in zip(
+                    pool.map(_load_f0_cached, self.f0_paths.values()),
+                    self.f0_paths,
+                )
+            ]
         score_data = [(self.score, "score")] if self.score else None
 
         if self.audio_hsm_path:
@@ -350,6 +392,8 @@ class MultiTrack(core.MultiTrack):
 
     def to_jams(self):
         """Jams: the track's data in jams format"""
+        # jams_utils imports jams and librosa, which are slow to import
+        from mirdata import jams_utils
 
         beat_data = [(self.beat, "beat")] if self.beat else None
 
@@ -359,18 +403,89 @@ class MultiTrack(core.MultiTrack):
 
 
 @io.coerce_to_bytes_io
-def load_audio(fhandle: BinaryIO) -> Tuple[np.ndarray, float]:
+def load_audio(
+    fhandle: BinaryIO, offset: float = 0.0, duration: Optional[float] = None
+) -> Tuple[np.ndarray, float]:
     """Load a Dagstuhl ChoirSet audio file.
 
     Args:
         audio_path (str): path pointing to an audio file
+        offset (float): start reading after this time (in seconds)
+        duration (float or None): only load up to this much audio (in seconds).
+            If None, the audio is loaded until the end of the file.
 
     Returns:
         * np.ndarray - the audio signal
         * float - The sample rate of the audio file
 
+    Raises:
+        ValueError: if offset is negative or past the end of the audio signal
+
+    If the ``MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE`` environment variable is set
+    to ``1`` or ``true``, the whole signal is resampled once, cached as a
+    ``.22050.mono.f32.npy`` file next to the audio file and returned as a
+    read-only ``np.memmap``. Excerpts are then sliced from the resampled signal,
+    so for files not sampled at 22050 Hz their edges may differ slightly from
+    an uncached load.
+
     """
-    return librosa.load(fhandle, sr=22050, mono=True)
+    sr = 22050
+    if not _npy_cache_enabled(fhandle):
+        return _decode_audio(fhandle, sr, offset, duration), sr
+
+    # the cache holds the whole resampled signal, excerpts are sliced from it
+    y = _load_npy_cached(
+        fhandle, f".{sr}.mono.f32.npy", lambda fh: _decode_audio(fh, sr), mmap=True
+    )
+    start = int(offset * sr)
+    _check_offset(offset, start, len(y))
+    stop = start + int(duration * sr) if duration is not None else None
+    return y[start:stop], sr
+
+
+def _check_offset(offset, start, n_samples):
+    # raise the same error whether excerpts are read from the audio file or
+    # sliced from the cache, where slicing would silently wrap or return nothing
+    if offset < 0 or start > n_samples:
+        raise ValueError(
+            "offset {} is outside of the audio signal ({} samples)".format(
+                offset, n_samples
+            )
+        )
+
+
+def _decode_audio(fhandle, sr, offset=0.0, duration=None):
+    # librosa is slow to import, so it is only imported in the branches
+    # that need it (fallback decoding and resampling)
+    try:
+        audio_file = sf.SoundFile(fhandle)
+    except RuntimeError:
+        # fall back to librosa for formats libsndfile cannot decode. Its
+        # audioread fallback needs a path, so in-memory files cannot use it.
+        path = getattr(fhandle, "name", None)
+        if not isinstance(path, str):
+            raise
+        import librosa
+
+        y, _ = librosa.load(path, sr=sr, mono=True, offset=offset, duration=duration)
+        return y
+
+    with audio_file:
+        native_sr = audio_file.samplerate
+        start = int(offset * native_sr)
+        _check_offset(offset, start, audio_file.frames)
+        if start:
+            audio_file.seek(start)
+        frames = int(duration * native_sr) if duration is not None else -1
+        y = audio_file.read(frames=frames, dtype="float32", always_2d=False)
+
+    if y.ndim > 1:
+        y = np.mean(y, axis=1)
+    if native_sr != sr:
+        import librosa
+
+        y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+    return y
 
 
 @io.coerce_to_string_io
@@ -382,20 +497,54 @@ def load_f0(fhandle: TextIO) -> annotations.F0Data:
 
     Returns:
         F0Data Object - the F0-trajectory
+
+    If the ``MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE`` environment variable is set
+    to ``1`` or ``true``, the parsed trajectory is cached as a ``.npy`` file next
+    to the F0 file and read from there on later loads.
     """
-    times = []
-    freqs = []
-    confs = []
-    reader = csv.reader(fhandle, delimiter=",")
-    for line in reader:
-        times.append(float(line[0]))
-        freqs.append(float(line[1]))
-        if len(line) == 3:
-            confs.append(float(line[2]))
-        else:
-            confs.append(float(1.0))
+    trajectory = _load_npy_cached(fhandle, ".npy", _parse_f0)
+    return annotations.F0Data(trajectory[0], trajectory[1], trajectory[2])
+
 
-    return annotations.F0Data(np.array(times), np.array(freqs), np.array(confs))
+def _parse_f0(fhandle):
+    # columns after the third are ignored
+    data = np.loadtxt(fhandle, delimiter=",", dtype=np.float64, ndmin=2)[:, :3]
+
+    # times, frequencies and confidence are stored as contiguous rows of a
+    # single buffer. Manual annotations have no confidence column, so their
+    # confidence stays at 1.
+    trajectory = np.ones((3, data.shape[0]))
+    trajectory[: data.shape[1]] = data.T
+    return trajectory
+
+
+@functools.lru_cache(maxsize=1024)
+def _load_f0_from_path(f0_path, mtime):
+    return load_f0(f0_path)
+
+
+def _load_f0_cached(f0_path):
+    """Load an F0-trajectory from a path, reusing previously parsed files.
+
+    Parsed trajectories are cached by absolute path and modification time,
+    so a file is only parsed again if it changed on disk. The returned object
+    is shared between callers and should not be modified in place. Use
+    ``clear_f0_cache()`` to release cached trajectories.
+
+    Args:
+        f0_path (str or None): path to F0 file
+
+    Returns:
+        F0Data Object - the F0-trajectory, or None if f0_path is None
+    """
+    if not f0_path:
+        return None
+    return _load_f0_from_path(os.path.abspath(f0_path), os.path.getmtime(f0_path))
+
+
+def clear_f0_cache():
+    """Release all F0-trajectories cached by the Track f0 properties."""
+    _load_f0_from_path.cache_clear()
 
 
 @io.coerce_to_string_io
@@ -407,15 +556,113 @@ def load_score(fhandle: TextIO) -> annotations.NoteData:
 
     Returns:
         NoteData Object - the time-aligned score representation
+
+    If the ``MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE`` environment variable is set
+    to ``1`` or ``true``, the parsed score is cached as a ``.npy`` file next to
+    the score file and read from there on later loads.
     """
-    intervals = np.empty((0, 2))
-    notes = []
-    reader = csv.reader(fhandle, delimiter=",")
-    for line in reader:
-        intervals = np.vstack([intervals, [float(line[0]), float(line[1])]])
-        notes.append(float(line[2]))
+    score = _load_npy_cached(fhandle, ".npy", _parse_score)
+    return annotations.NoteData(score[:, :2], _midi_to_hz(score[:, 2]), None)
+
+
+def _parse_score(fhandle):
+    # the files are plain comma-separated numbers, so split them directly
+    # instead of going through csv.reader
+    lines = [line for line in fhandle.read().splitlines() if line]
 
-    return annotations.NoteData(intervals, librosa.midi_to_hz(notes), None)
+    # the number of values is known up front, so fill a preallocated buffer
+    # instead of building nested lists first
+    values = (value for line in lines for value in line.split(",")[:3])
+    score = np.fromiter(values, dtype=np.float64, count=3 * len(lines))
+
+    # columns: start time, end time, MIDI pitch
+    return score.reshape(len(lines), 3)
+
+
+def _midi_to_hz(notes):
+    """Convert MIDI note numbers to frequencies in Hz.
+
+    The conversion is done in place on a single float64 buffer,
+    without allocating temporaries for the intermediate steps.
+
+    Args:
+        notes (array-like): MIDI note numbers
+
+    Returns:
+        np.ndarray: frequencies in Hz
+    """
+    frequencies = np.array(notes, dtype=np.float64)
+    frequencies -= 69.0
+    frequencies /= 12.0
+    np.power(2.0, frequencies, out=frequencies)
+    frequencies *= 440.0
+    return frequencies
+
+
+def _npy_cache_enabled(fhandle):
+    # in-memory file objects have no path to store a cache next to
+    enabled = os.environ.get(_NPY_CACHE_ENV, "").strip().lower()
+    return enabled in _NPY_CACHE_ENABLED_VALUES and isinstance(
+        getattr(fhandle, "name", None), str
+    )
+
+
+def _load_npy_cached(fhandle, suffix, parse, mmap=False):
+    """Parse a file into an array, optionally caching it as a .npy file.
+
+    Caching is enabled by setting the ``MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE``
+    environment variable to ``1``, ``true``, ``yes`` or ``on``. The cache is written next to the original file and is
+    read on later loads. It is ignored once it is older than the original file.
+
+    Args:
+        fhandle (file-like): open handle to the original file
+        suffix (str): suffix appended to the original path for the cache file
+        parse (function): function parsing fhandle into an np.ndarray
+        mmap (bool): if True, cached arrays are memory-mapped read-only.
+            Every memory map keeps a file descriptor open while it is alive,
+            so this is only worth it for large arrays.
+
+    Returns:
+        np.ndarray - the parsed array
+    """
+    if not _npy_cache_enabled(fhandle):
+        return parse(fhandle)
+
+    cache_path = fhandle.name + suffix
+    try:
+        cache_is_fresh = (
+            os.stat(cache_path).st_mtime >= os.fstat(fhandle.fileno()).st_mtime
+        )
+    except FileNotFoundError:
+        cache_is_fresh = False
+    if cache_is_fresh:
+        try:
+            return np.load(cache_path, mmap_mode="r" if mmap else None)
+        except OSError:
+            # e.g. a cache written by another user that is not readable
+            pass
+
+    data = parse(fhandle)
+    try:
+        _save_npy_atomic(cache_path, data)
+    except OSError:
+        # e.g. a read-only data_home, the parsed data is still valid
+        pass
+    return data
+
+
+def _save_npy_atomic(path, data):
+    # write to a temporary file and move it into place, so readers never see
+    # a partial file and existing memory maps of an older cache keep their inode
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            np.save(tmp_file, data)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
 
 
 @io.coerce_to_string_io
@@ -476,3 +723,61 @@ class Dataset(core.Dataset):
     @core.copy_docs(load_beat)
     def load_beat(self, *args, **kwargs):
         return load_beat(*args, **kwargs)
+
+    def load_all_f0(self, track_ids=None, n_jobs=None):
+        """Load the f0 annotations of several tracks in parallel.
+
+        Args:
+            track_ids (list or None): ids of the tracks to load.
+                If None, all tracks are loaded.
+            n_jobs (int or None): number of threads to use.
+                If None, uses the ThreadPoolExecutor default.
+
+        Returns:
+            dict: {`f0 path`: F0Data}
+
+        """
+        f0_paths = [
+            path
+            for track in self._tracks(track_ids)
+            for path in track.f0_paths.values()
+            if path
+        ]
+        # parsing is dominated by numpy, so threads are enough
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            return dict(zip(f0_paths, pool.map(_load_f0_cached, f0_paths)))
+
+    def load_all_audio(self, track_ids=None, n_jobs=None):
+        """Load the close-up microphone audio of several tracks in parallel.
+
+        The whole dataset holds several GB of decoded audio, so passing a
+        subset of track_ids is recommended. With the .npy cache enabled, every
+        returned signal is a memory map holding an open file descriptor, so
+        the number of files loaded at once is limited by the open file limit
+        (``ulimit -n``).
+
+        Args:
+            track_ids (list or None): ids of the tracks to load.
+                If None, all tracks are loaded.
+            n_jobs (int or None): number of threads to use.
+                If None, uses the ThreadPoolExecutor default.
+
+        Returns:
+            dict: {`audio path`: (np.ndarray, float)}
+
+        """
+        audio_paths = [
+            path
+            for track in self._tracks(track_ids)
+            for path in track.audio_paths.values()
+            if path
+        ]
+        # libsndfile decodes without holding the GIL, and threads avoid
+        # copying every decoded signal back from worker processes
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            return dict(zip(audio_paths, pool.map(load_audio, audio_paths)))
+
+    def _tracks(self, track_ids):
+        if track_ids is None:
+            track_ids = self.track_ids
+        return [self.track(track_id) for track_id in track_ids]
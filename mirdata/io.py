@@ -27,18 +27,18 @@ def coerce_to_string_io(
     return wrapper
 
 
-def coerce_to_bytes_io(
-    func: Callable[[BinaryIO], T]
-) -> Callable[[Optional[Union[str, BinaryIO]]], Optional[T]]:
+def coerce_to_bytes_io(func: Callable[..., T]) -> Callable[..., Optional[T]]:
     @functools.wraps(func)
-    def wrapper(file_path_or_obj: Optional[Union[str, BinaryIO]]) -> Optional[T]:
+    def wrapper(
+        file_path_or_obj: Optional[Union[str, BinaryIO]], *args, **kwargs
+    ) -> Optional[T]:
         if not file_path_or_obj:
             return None
         if isinstance(file_path_or_obj, str):
             with open(file_path_or_obj, "rb") as f:
-                return func(f)
+                return func(f, *args, **kwargs)
         elif isinstance(file_path_or_obj, io.BytesIO):
-            return func(file_path_or_obj)
+            return func(file_path_or_obj, *args, **kwargs)
         else:
             raise ValueError(
                 "Invalid argument passed to {}, argument has the type {}",
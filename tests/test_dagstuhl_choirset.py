@@ -1,5 +1,10 @@
+import io
+import os
+import shutil
+
 import numpy as np
 import pytest
+import soundfile as sf
 
 from mirdata.datasets import dagstuhl_choirset
 from mirdata import annotations
@@ -26,6 +31,17 @@ def test_track():
         "f0_manual_lrx_path": "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_F0_manual/DCS_LI_QuartetB_Take04_B2_LRX.csv",
         "score_path": "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_scorerepresentation/DCS_LI_QuartetB_Take04_Stereo_STM_B.csv",
     }
+    expected_attributes["audio_paths"] = {
+        mic: expected_attributes[f"audio_{mic}_path"] for mic in ["dyn", "hsm", "lrx"]
+    }
+    expected_attributes["f0_paths"] = {
+        (method, mic): expected_attributes[f"f0_{method}_{mic}_path"]
+        for method in ["crepe", "pyin"]
+        for mic in ["dyn", "hsm", "lrx"]
+    }
+    expected_attributes["f0_paths"][("manual", "lrx")] = expected_attributes[
+        "f0_manual_lrx_path"
+    ]
 
     expected_property_types = {
         "f0_crepe_dyn": annotations.F0Data,
@@ -69,6 +85,40 @@ def test_audio_track():
     assert track.audio_hsm is None
 
 
+def test_load_audio():
+    audio_path = "tests/resources/mir_datasets/dagstuhl_choirset/audio_wav_22050_mono/DCS_LI_QuartetB_Take04_B2_DYN.wav"
+    y, sr = dagstuhl_choirset.load_audio(audio_path)
+    assert sr == 22050
+    assert y.dtype == np.float32
+    assert y.shape == (22050,)
+
+    y_excerpt, sr = dagstuhl_choirset.load_audio(audio_path, offset=0.5, duration=0.25)
+    assert sr == 22050
+    assert np.array_equal(y_excerpt, y[11025 : 11025 + 5512])
+
+    y_tail, _ = dagstuhl_choirset.load_audio(audio_path, offset=0.5)
+    assert np.array_equal(y_tail, y[11025:])
+
+
+def test_load_audio_resample(tmp_path):
+    audio_path = "tests/resources/mir_datasets/dagstuhl_choirset/audio_wav_22050_mono/DCS_LI_QuartetB_Take04_B2_DYN.wav"
+    y, _ = dagstuhl_choirset.load_audio(audio_path)
+
+    # stereo file at a different sample rate is downmixed and resampled
+    stereo_path = str(tmp_path / "stereo.wav")
+    sf.write(stereo_path, np.stack([y, y], axis=1)[::2], 11025)
+    y_resampled, sr = dagstuhl_choirset.load_audio(stereo_path)
+    assert sr == 22050
+    assert y_resampled.ndim == 1
+    assert len(y_resampled) == 22050
+
+
+def test_load_audio_undecodable():
+    # in-memory files libsndfile cannot decode are not passed on to librosa
+    with pytest.raises(RuntimeError):
+        dagstuhl_choirset.load_audio(io.BytesIO(b"not an audio file"))
+
+
 def test_load_f0():
     f0_path = "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_F0_CREPE/DCS_LI_QuartetB_Take04_B2_DYN.csv"
     f0 = dagstuhl_choirset.load_f0(f0_path)
@@ -100,6 +150,10 @@ def test_load_f0():
         ),
     )
 
+    # all three arrays are contiguous views of one buffer
+    assert f0.times.flags["C_CONTIGUOUS"]
+    assert f0.times.base is f0.frequencies.base is f0.confidence.base
+
     f0_path = "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_F0_manual/DCS_LI_QuartetB_Take04_B2_LRX.csv"
     f0 = dagstuhl_choirset.load_f0(f0_path)
     assert isinstance(f0, annotations.F0Data)
@@ -123,6 +177,32 @@ def test_load_f0():
     assert np.array_equal(f0.confidence, np.array([1, 1, 1, 1, 1]))
 
 
+def test_load_f0_extra_columns(tmp_path):
+    f0_path = tmp_path / "f0.csv"
+    f0_path.write_text("0.0,100.0,0.5,7.0\n0.01,110.0,0.6,8.0\n")
+    f0 = dagstuhl_choirset.load_f0(str(f0_path))
+    assert np.array_equal(f0.times, np.array([0.0, 0.01]))
+    assert np.array_equal(f0.frequencies, np.array([100.0, 110.0]))
+    assert np.array_equal(f0.confidence, np.array([0.5, 0.6]))
+
+
+def test_load_f0_cached():
+    default_trackid = "DCS_LI_QuartetB_Take04_B2"
+    data_home = "tests/resources/mir_datasets/dagstuhl_choirset"
+    dataset = dagstuhl_choirset.Dataset(data_home)
+
+    # separate track objects share the parsed trajectory
+    f0 = dataset.track(default_trackid).f0_crepe_dyn
+    assert dataset.track(default_trackid).f0_crepe_dyn is f0
+    assert dagstuhl_choirset._load_f0_cached(None) is None
+
+    # clearing the cache parses the file again
+    dagstuhl_choirset.clear_f0_cache()
+    f0_reloaded = dataset.track(default_trackid).f0_crepe_dyn
+    assert f0_reloaded is not f0
+    assert np.array_equal(f0_reloaded.frequencies, f0.frequencies)
+
+
 def test_load_score():
 
     score_path = "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_scorerepresentation/DCS_LI_QuartetB_Take04_Stereo_STM_B.csv"
@@ -151,6 +231,161 @@ def test_load_score():
     assert score.confidence is None
 
 
+def test_npy_cache(tmp_path, monkeypatch):
+    data_home = "tests/resources/mir_datasets/dagstuhl_choirset"
+    f0_path = str(tmp_path / "f0.csv")
+    score_path = str(tmp_path / "score.csv")
+    shutil.copy(
+        data_home + "/annotations_csv_F0_CREPE/DCS_LI_QuartetB_Take04_B2_DYN.csv",
+        f0_path,
+    )
+    shutil.copy(
+        data_home
+        + "/annotations_csv_scorerepresentation/DCS_LI_QuartetB_Take04_Stereo_STM_B.csv",
+        score_path,
+    )
+
+    # no cache files are written unless enabled
+    dagstuhl_choirset.load_f0(f0_path)
+    assert not (tmp_path / "f0.csv.npy").exists()
+    for disabled in ["0", "false", "off", ""]:
+        monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", disabled)
+        dagstuhl_choirset.load_f0(f0_path)
+        assert not (tmp_path / "f0.csv.npy").exists()
+
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+    f0 = dagstuhl_choirset.load_f0(f0_path)
+    score = dagstuhl_choirset.load_score(score_path)
+    assert (tmp_path / "f0.csv.npy").exists()
+    assert (tmp_path / "score.csv.npy").exists()
+
+    f0_cached = dagstuhl_choirset.load_f0(f0_path)
+    assert not isinstance(f0_cached.times, np.memmap)
+    assert np.array_equal(f0_cached.times, f0.times)
+    assert np.array_equal(f0_cached.frequencies, f0.frequencies)
+    assert np.array_equal(f0_cached.confidence, f0.confidence)
+
+    score_cached = dagstuhl_choirset.load_score(score_path)
+    assert not isinstance(score_cached.intervals, np.memmap)
+    assert np.array_equal(score_cached.intervals, score.intervals)
+    assert np.array_equal(score_cached.notes, score.notes)
+
+
+def test_npy_cache_rewrite(tmp_path, monkeypatch):
+    f0_path = tmp_path / "f0.csv"
+    f0_path.write_text("0.0,100.0,0.5\n0.01,110.0,0.6\n0.02,120.0,0.7\n")
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+    dagstuhl_choirset.load_f0(str(f0_path))
+    f0_old = dagstuhl_choirset.load_f0(str(f0_path))
+
+    # a shorter file replaces the cache without touching the old mapping
+    f0_path.write_text("0.0,200.0,0.1\n")
+    cache_mtime = os.stat(str(f0_path) + ".npy").st_mtime
+    os.utime(str(f0_path), (cache_mtime + 10, cache_mtime + 10))
+    f0_new = dagstuhl_choirset.load_f0(str(f0_path))
+
+    assert np.array_equal(f0_new.frequencies, np.array([200.0]))
+    assert np.array_equal(f0_old.frequencies, np.array([100.0, 110.0, 120.0]))
+    assert np.array_equal(f0_old.confidence, np.array([0.5, 0.6, 0.7]))
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+
+
+def test_npy_cache_file_limit(tmp_path, monkeypatch):
+    resource = pytest.importorskip("resource")
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    n_files = 256
+    f0_paths = []
+    for i in range(n_files):
+        f0_path = str(tmp_path / f"f0_{i}.csv")
+        with open(f0_path, "w") as fhandle:
+            fhandle.write(f"0.0,{100.0 + i},0.5\n")
+        f0_paths.append(f0_path)
+
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+    for f0_path in f0_paths:
+        dagstuhl_choirset.load_f0(f0_path)
+
+    # cached annotations must not keep a file descriptor open each
+    resource.setrlimit(resource.RLIMIT_NOFILE, (n_files // 2, hard_limit))
+    try:
+        f0s = [dagstuhl_choirset.load_f0(f0_path) for f0_path in f0_paths]
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
+    assert [f0.frequencies[0] for f0 in f0s] == [100.0 + i for i in range(n_files)]
+
+
+def test_npy_cache_unwritable(tmp_path, monkeypatch):
+    f0_path = tmp_path / "f0.csv"
+    f0_path.write_text("0.0,100.0,0.5\n0.01,110.0,0.6\n")
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(dagstuhl_choirset.tempfile, "mkstemp", read_only)
+    f0 = dagstuhl_choirset.load_f0(str(f0_path))
+    assert np.array_equal(f0.frequencies, np.array([100.0, 110.0]))
+    assert not (tmp_path / "f0.csv.npy").exists()
+
+
+def test_npy_cache_permissions(tmp_path, monkeypatch):
+    f0_path = str(tmp_path / "f0.csv")
+    with open(f0_path, "w") as fhandle:
+        fhandle.write("0.0,100.0,0.5\n0.01,110.0,0.6\n")
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+    dagstuhl_choirset.load_f0(f0_path)
+
+    # the cache gets the same permissions as other new files
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(f0_path + ".npy").st_mode & 0o777 == 0o666 & ~umask
+
+    # an unreadable cache is treated as missing
+    def unreadable(*args, **kwargs):
+        raise PermissionError("permission denied")
+
+    monkeypatch.setattr(dagstuhl_choirset.np, "load", unreadable)
+    f0 = dagstuhl_choirset.load_f0(f0_path)
+    assert np.array_equal(f0.frequencies, np.array([100.0, 110.0]))
+
+
+def test_audio_npy_cache(tmp_path, monkeypatch):
+    audio_path = str(tmp_path / "audio.wav")
+    shutil.copy(
+        "tests/resources/mir_datasets/dagstuhl_choirset/audio_wav_22050_mono/DCS_LI_QuartetB_Take04_B2_DYN.wav",
+        audio_path,
+    )
+    y, sr = dagstuhl_choirset.load_audio(audio_path)
+
+    monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+    dagstuhl_choirset.load_audio(audio_path)
+    assert (tmp_path / "audio.wav.22050.mono.f32.npy").exists()
+
+    y_cached, sr_cached = dagstuhl_choirset.load_audio(audio_path)
+    assert sr_cached == sr
+    assert isinstance(y_cached, np.memmap)
+    assert np.array_equal(y_cached, y)
+
+    y_excerpt, _ = dagstuhl_choirset.load_audio(audio_path, offset=0.5, duration=0.25)
+    assert np.array_equal(y_excerpt, y[11025 : 11025 + 5512])
+
+    # offsets outside of the signal raise with and without the cache
+    for offset in [-0.5, 100.0]:
+        with pytest.raises(ValueError):
+            dagstuhl_choirset.load_audio(audio_path, offset=offset)
+        monkeypatch.delenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE")
+        with pytest.raises(ValueError):
+            dagstuhl_choirset.load_audio(audio_path, offset=offset)
+        monkeypatch.setenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE", "1")
+
+    # an offset at the end of the signal gives an empty excerpt on both paths
+    y_end, _ = dagstuhl_choirset.load_audio(audio_path, offset=len(y) / sr)
+    assert len(y_end) == 0
+    monkeypatch.delenv("MIRDATA_DAGSTUHL_CHOIRSET_NPY_CACHE")
+    y_end, _ = dagstuhl_choirset.load_audio(audio_path, offset=len(y) / sr)
+    assert len(y_end) == 0
+
+
 def test_load_beat():
 
     beat_path = "tests/resources/mir_datasets/dagstuhl_choirset/annotations_csv_beat/DCS_LI_QuartetB_Take04_Stereo_STM.csv"
@@ -165,6 +400,25 @@ def test_load_beat():
     assert np.array_equal(beat.positions, np.array([1, 2, 3, 4, 1]))
 
 
+def test_load_all():
+    default_trackid = "DCS_LI_QuartetB_Take04_B2"
+    data_home = "tests/resources/mir_datasets/dagstuhl_choirset"
+    dataset = dagstuhl_choirset.Dataset(data_home)
+    track = dataset.track(default_trackid)
+
+    f0s = dataset.load_all_f0([default_trackid], n_jobs=2)
+    assert len(f0s) == 7
+    assert np.array_equal(
+        f0s[track.f0_crepe_dyn_path].frequencies, track.f0_crepe_dyn.frequencies
+    )
+
+    audio = dataset.load_all_audio(track_ids=[default_trackid], n_jobs=2)
+    assert len(audio) == 3
+    y, sr = audio[track.audio_lrx_path]
+    assert sr == 22050
+    assert np.array_equal(y, track.audio_lrx[0])
+
+
 def test_score_track():
     default_trackid = "DCS_TP_FullChoir_Outtake_A1"
     data_home = "tests/resources/mir_datasets/dagstuhl_choirset"
@@ -69,6 +69,15 @@ def test_coerce_to_bytes_io_with_bytesio():
         func(f)
 
 
+def test_coerce_to_bytes_io_forwards_arguments():
+    @io.coerce_to_bytes_io
+    def func(fh, offset, duration=None):
+        return offset, duration
+
+    with BytesIO(b"abc") as f:
+        assert func(f, 1.0, duration=2.0) == (1.0, 2.0)
+
+
 def test_invalid_coerce_to_bytes_io():
     @io.coerce_to_bytes_io
     def func(fh):
@@ -360,7 +360,8 @@ SKIP = {
         "load_lastfm_validation",
         "load_discogs_train",
         "load_discogs_validation",
-    ]
+    ],
+    "dagstuhl_choirset": ["load_all_f0", "load_all_audio"],
 }
 
 